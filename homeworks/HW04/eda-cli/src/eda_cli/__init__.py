@@ -6,7 +6,17 @@ eda_cli – мини-утилита для EDA CSV-файлов.
 - на Семинаре 04 как библиотека для обёрток (HTTP-сервис и т.п.).
 """
 
-from . import core, viz
+import importlib
+from typing import Any
+
+from . import core
 
 __all__ = ["core", "viz"]
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    # viz (а с ним и matplotlib) импортируется лениво — при первом обращении eda_cli.viz
+    if name == "viz":
+        return importlib.import_module(f"{__name__}.viz")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,16 +1,26 @@
 from __future__ import annotations
 
+import hashlib
+import os
+import threading
 import time
-from io import BytesIO
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import IO, Any, Dict, List, NamedTuple, Optional, Tuple, Union
 
 import pandas as pd
-from fastapi import FastAPI, File, HTTPException, UploadFile
-from pydantic import BaseModel, Field
+from fastapi import Body, FastAPI, File, HTTPException, UploadFile
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
-from .core import ColumnSummary, DatasetSummary, compute_quality_flags, missing_table, summarize_dataset
+from .core import DatasetSummary, compute_quality_flags, missing_table, summarize_dataset
 
-app = FastAPI(title="eda-cli quality service", version="0.1.0")
+app = FastAPI(
+    title="eda-cli quality service",
+    version="0.1.0",
+    default_response_class=ORJSONResponse,
+)
 
 
 # ---------- Pydantic models (JSON endpoint /quality) ----------
@@ -49,56 +59,141 @@ class QualityResponse(BaseModel):
     flags: Dict[str, Any]
 
 
+class QualityFlagsResponse(BaseModel):
+    latency_ms: int
+    flags: Dict[str, Any]
+
+
+# Валидатор тела /quality собираем один раз при импорте и переиспользуем во всех запросах
+QualityRequest.model_rebuild()
+_QUALITY_REQUEST_ADAPTER: TypeAdapter[QualityRequest] = TypeAdapter(QualityRequest)
+
+
 # ---------- helpers ----------
 
-def _summary_in_to_core(summary_in: DatasetSummaryIn) -> DatasetSummary:
-    cols = [
-        ColumnSummary(
-            name=c.name,
-            dtype=c.dtype,
-            non_null=c.non_null,
-            missing=c.missing,
-            missing_share=c.missing_share,
-            unique=c.unique,
-            example_values=c.example_values,
-            is_numeric=c.is_numeric,
-            min=c.min,
-            max=c.max,
-            mean=c.mean,
-            std=c.std,
-        )
-        for c in summary_in.columns
-    ]
-    return DatasetSummary(n_rows=summary_in.n_rows, n_cols=summary_in.n_cols, columns=cols)
-
-
-def _missing_df_from_summary(summary: DatasetSummary) -> pd.DataFrame:
-    # Формируем missing_df совместимый с compute_quality_flags(summary, missing_df)
-    data = {
-        c.name: {"missing_count": c.missing, "missing_share": c.missing_share}
-        for c in summary.columns
-    }
-    if not data:
-        return pd.DataFrame(columns=["missing_count", "missing_share"])
-    return pd.DataFrame.from_dict(data, orient="index").sort_values("missing_share", ascending=False)
-
-
-def _ok_for_model(flags: Dict[str, Any]) -> bool:
+def _quality_request_schemas() -> Dict[str, Any]:
+    # Схемы тела /quality в формате components/schemas (QualityRequest + вложенные модели через $ref)
+    schema = _QUALITY_REQUEST_ADAPTER.json_schema(ref_template="#/components/schemas/{model}")
+    defs = schema.pop("$defs", {})
+    return {**defs, "QualityRequest": schema}
+
+
+def _openapi() -> Dict[str, Any]:
+    # Тело /quality принимается как dict, поэтому в документации подменяем его схему на QualityRequest
+    # (расширение схемы через app.openapi — штатный способ FastAPI)
+    if app.openapi_schema is None:
+        schema = FastAPI.openapi(app)
+        # exclude_none — как при сборке остальной схемы в FastAPI (без "default": null)
+        extra = jsonable_encoder(_quality_request_schemas(), exclude_none=True)
+        schema.setdefault("components", {}).setdefault("schemas", {}).update(extra)
+        body = schema["paths"]["/quality"]["post"]["requestBody"]["content"]["application/json"]
+        body["schema"] = {"$ref": "#/components/schemas/QualityRequest"}
+    return app.openapi_schema
+
+
+app.openapi = _openapi  # type: ignore[method-assign]
+
+
+def _parse_quality_request(body: Dict[str, Any]) -> QualityRequest:
+    # Тело уже разобрано FastAPI (content-type, пустое тело, битый JSON); здесь только общий валидатор
+    try:
+        return _QUALITY_REQUEST_ADAPTER.validate_python(body)
+    except ValidationError as exc:
+        errors = [{**e, "loc": ("body", *e["loc"])} for e in exc.errors(include_url=False)]
+        raise RequestValidationError(errors) from exc
+
+
+class _MissingRow(NamedTuple):
+    column: str
+    missing_count: int
+    missing_share: float
+
+
+def _missing_rows_from_summary(summary: DatasetSummaryIn) -> List[_MissingRow]:
+    # Строки пропусков совместимые с compute_quality_flags(summary, missing_df) — без сборки DataFrame
+    return sorted(
+        (_MissingRow(c.name, c.missing, c.missing_share) for c in summary.columns),
+        key=lambda r: -r.missing_share,
+    )
+
+
+def _ok_for_model(score: float, too_many_missing: bool) -> bool:
     # Простая логика для ok_for_model (достаточно для ДЗ)
-    return bool(flags.get("quality_score", 0.0) >= 0.5) and not bool(flags.get("too_many_missing", False))
+    return score >= 0.5 and not too_many_missing
 
 
-def _read_csv_upload(file: UploadFile) -> pd.DataFrame:
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="Файл не задан")
+_THRESHOLD_ERRORS = (
+    "high_cardinality_unique должен быть >= 1",
+    "high_cardinality_share должен быть в диапазоне [0..1]",
+)
+
+
+def _check_thresholds(high_cardinality_unique: int, high_cardinality_share: float) -> None:
+    # Обе проверки сворачиваем в битовую маску и ветвимся один раз; unique проверяется первым, как и раньше
+    mask = (high_cardinality_unique < 1) | ((not 0.0 <= high_cardinality_share <= 1.0) << 1)
+    if mask:
+        raise HTTPException(status_code=400, detail=_THRESHOLD_ERRORS[0 if mask & 1 else 1])
+
+
+class _SummaryCache:
+    """
+    LRU-кэш (summary, missing_df) по хэшу содержимого загруженного CSV.
+    Повторная загрузка того же файла не парсится и не пересчитывается заново.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[str, Tuple[DatasetSummary, pd.DataFrame]] = OrderedDict()
+        self._lock = threading.Lock()  # CSV-эндпоинты работают в threadpool
+
+    def get(self, key: str) -> Optional[Tuple[DatasetSummary, pd.DataFrame]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Tuple[DatasetSummary, pd.DataFrame]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+_CSV_SUMMARY_CACHE = _SummaryCache(maxsize=32)
+
+
+def _file_digest(f: IO[bytes], chunk_size: int = 1 << 20) -> str:
+    # Хэшируем файл кусками и возвращаемся в начало — для pd.read_csv
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in iter(lambda: f.read(chunk_size), b""):
+        h.update(chunk)
+    f.seek(0)
+    return h.hexdigest()
 
+
+def _read_csv_upload(file: UploadFile) -> pd.DataFrame:
     try:
-        raw = file.file.read()
-        if not raw:
-            raise HTTPException(status_code=400, detail="Пустой CSV")
-        df = pd.read_csv(BytesIO(raw))
-    except HTTPException:
-        raise
+        # Читаем прямо из SpooledTemporaryFile, без промежуточной копии всего файла в bytes
+        df = pd.read_csv(file.file)
+    except pd.errors.EmptyDataError as exc:
+        raise HTTPException(status_code=400, detail="Пустой CSV") from exc
     except Exception as exc:  # noqa: BLE001
         raise HTTPException(status_code=400, detail=f"Не удалось прочитать CSV: {exc}") from exc
 
@@ -107,102 +202,132 @@ def _read_csv_upload(file: UploadFile) -> pd.DataFrame:
     return df
 
 
+def _summary_from_csv_upload(file: UploadFile) -> Tuple[DatasetSummary, pd.DataFrame]:
+    if not file.filename:
+        raise HTTPException(status_code=400, detail="Файл не задан")
+
+    key = _file_digest(file.file)
+    cached = _CSV_SUMMARY_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    df = _read_csv_upload(file)
+    result = (summarize_dataset(df), missing_table(df))
+    _CSV_SUMMARY_CACHE.put(key, result)
+    return result
+
+
+def _flags_from_csv_upload(
+    file: UploadFile,
+    high_cardinality_unique: int,
+    high_cardinality_share: float,
+) -> Dict[str, Any]:
+    summary, miss = _summary_from_csv_upload(file)
+    return compute_quality_flags(
+        summary,
+        miss,
+        high_cardinality_unique=high_cardinality_unique,
+        high_cardinality_share=high_cardinality_share,
+    )
+
+
 # ---------- endpoints ----------
 
 @app.get("/health")
-def health() -> Dict[str, str]:
-    return {"status": "ok"}
+def health() -> Dict[str, Any]:
+    return {"status": "ok", "csv_cache": _CSV_SUMMARY_CACHE.stats()}
+
+
+def _debug_enabled() -> bool:
+    return os.environ.get("EDA_CLI_DEBUG", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@app.post("/cache/clear", include_in_schema=False)
+def cache_clear() -> Dict[str, Any]:
+    """
+    Сбрасывает кэш summary по загруженным CSV (для отладки).
+    Доступен только при EDA_CLI_DEBUG=1, иначе отвечает 404.
+    """
+    if not _debug_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    _CSV_SUMMARY_CACHE.clear()
+    return {"status": "ok", "csv_cache": _CSV_SUMMARY_CACHE.stats()}
+
 
+# response_model=None: ответ собираем сами из доверенных данных, повторная валидация не нужна;
+# responses=... оставляет QualityResponse в документации OpenAPI
+_QUALITY_RESPONSES: Dict[Union[int, str], Dict[str, Any]] = {200: {"model": QualityResponse}}
 
-@app.post("/quality", response_model=QualityResponse)
-def quality(req: QualityRequest) -> QualityResponse:
-    t0 = time.perf_counter()
 
-    if req.high_cardinality_unique < 1:
-        raise HTTPException(status_code=400, detail="high_cardinality_unique должен быть >= 1")
-    if not (0.0 <= req.high_cardinality_share <= 1.0):
-        raise HTTPException(status_code=400, detail="high_cardinality_share должен быть в диапазоне [0..1]")
+@app.post("/quality", response_model=None, responses=_QUALITY_RESPONSES)
+def quality(body: Dict[str, Any] = Body(...)) -> QualityResponse:
+    req = _parse_quality_request(body)
+    t0 = time.monotonic_ns()
 
-    summary = _summary_in_to_core(req.summary)
-    missing_df = _missing_df_from_summary(summary)
+    _check_thresholds(req.high_cardinality_unique, req.high_cardinality_share)
+
+    # compute_quality_flags читает только атрибуты, поэтому DatasetSummaryIn передаём как есть (без копии в dataclass)
+    summary = req.summary
+    missing_rows = _missing_rows_from_summary(summary)
 
     flags = compute_quality_flags(
         summary,
-        missing_df,
+        missing_rows,
         high_cardinality_unique=req.high_cardinality_unique,
         high_cardinality_share=req.high_cardinality_share,
     )
 
-    latency_ms = int((time.perf_counter() - t0) * 1000)
-    return QualityResponse(
-        ok_for_model=_ok_for_model(flags),
-        quality_score=float(flags.get("quality_score", 0.0)),
+    latency_ms = (time.monotonic_ns() - t0) // 1_000_000
+    score = float(flags.get("quality_score", 0.0))
+    return QualityResponse.model_construct(
+        ok_for_model=_ok_for_model(score, bool(flags.get("too_many_missing", False))),
+        quality_score=score,
         latency_ms=latency_ms,
         flags=flags,
     )
 
 
-@app.post("/quality-from-csv", response_model=QualityResponse)
+@app.post("/quality-from-csv", response_model=None, responses=_QUALITY_RESPONSES)
 def quality_from_csv(
     file: UploadFile = File(...),
     high_cardinality_unique: int = 50,
     high_cardinality_share: float = 0.5,
 ) -> QualityResponse:
-    t0 = time.perf_counter()
-
-    if high_cardinality_unique < 1:
-        raise HTTPException(status_code=400, detail="high_cardinality_unique должен быть >= 1")
-    if not (0.0 <= high_cardinality_share <= 1.0):
-        raise HTTPException(status_code=400, detail="high_cardinality_share должен быть в диапазоне [0..1]")
+    t0 = time.monotonic_ns()
 
-    df = _read_csv_upload(file)
+    _check_thresholds(high_cardinality_unique, high_cardinality_share)
 
-    summary = summarize_dataset(df)
-    miss = missing_table(df)
-    flags = compute_quality_flags(
-        summary,
-        miss,
-        high_cardinality_unique=high_cardinality_unique,
-        high_cardinality_share=high_cardinality_share,
-    )
+    # Обработчик синхронный: FastAPI сам выполняет его в threadpool, event loop не блокируется
+    flags = _flags_from_csv_upload(file, high_cardinality_unique, high_cardinality_share)
 
-    latency_ms = int((time.perf_counter() - t0) * 1000)
-    return QualityResponse(
-        ok_for_model=_ok_for_model(flags),
-        quality_score=float(flags.get("quality_score", 0.0)),
+    latency_ms = (time.monotonic_ns() - t0) // 1_000_000
+    score = float(flags.get("quality_score", 0.0))
+    return QualityResponse.model_construct(
+        ok_for_model=_ok_for_model(score, bool(flags.get("too_many_missing", False))),
+        quality_score=score,
         latency_ms=latency_ms,
         flags=flags,
     )
 
 
 # ---- ОБЯЗАТЕЛЬНЫЙ ДОП. ЭНДПОИНТ HW04 (использует эвристики HW03) ----
-@app.post("/quality-flags-from-csv")
+# Ответ отдаём ORJSONResponse напрямую; модель нужна только для документации OpenAPI
+@app.post("/quality-flags-from-csv", response_model=None, responses={200: {"model": QualityFlagsResponse}})
 def quality_flags_from_csv(
     file: UploadFile = File(...),
     high_cardinality_unique: int = 50,
     high_cardinality_share: float = 0.5,
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """
     Возвращает полный набор флагов качества, включая эвристики HW03:
     has_constant_columns, has_high_cardinality_categoricals, high_cardinality_unique, high_cardinality_share, ...
     """
-    t0 = time.perf_counter()
-
-    if high_cardinality_unique < 1:
-        raise HTTPException(status_code=400, detail="high_cardinality_unique должен быть >= 1")
-    if not (0.0 <= high_cardinality_share <= 1.0):
-        raise HTTPException(status_code=400, detail="high_cardinality_share должен быть в диапазоне [0..1]")
+    t0 = time.monotonic_ns()
 
-    df = _read_csv_upload(file)
+    _check_thresholds(high_cardinality_unique, high_cardinality_share)
 
-    summary = summarize_dataset(df)
-    miss = missing_table(df)
-    flags = compute_quality_flags(
-        summary,
-        miss,
-        high_cardinality_unique=high_cardinality_unique,
-        high_cardinality_share=high_cardinality_share,
-    )
+    # Обработчик синхронный: FastAPI сам выполняет его в threadpool, event loop не блокируется
+    flags = _flags_from_csv_upload(file, high_cardinality_unique, high_cardinality_share)
 
-    latency_ms = int((time.perf_counter() - t0) * 1000)
-    return {"latency_ms": latency_ms, "flags": flags}
+    latency_ms = (time.monotonic_ns() - t0) // 1_000_000
+    return ORJSONResponse({"latency_ms": latency_ms, "flags": flags})
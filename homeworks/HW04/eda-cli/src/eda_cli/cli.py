@@ -1,24 +1,19 @@
 from __future__ import annotations
 
+import csv
 from pathlib import Path
-from typing import Optional
+from typing import Any, Iterable, List, Optional, Sequence
 
 import pandas as pd
 import typer
+from rich.console import Console
+from rich.table import Table
 
 from .core import (
     DatasetSummary,
+    analyze,
     compute_quality_flags,
-    correlation_matrix,
-    flatten_summary_for_print,
-    missing_table,
     summarize_dataset,
-    top_categories,
-)
-from .viz import (
-    plot_correlation_heatmap,
-    plot_histograms_per_column,
-    plot_missing_matrix,
 )
 
 app = typer.Typer(help="Мини-приложение для EDA по CSV.")
@@ -27,9 +22,49 @@ app = typer.Typer(help="Мини-приложение для EDA по CSV.")
 def _load_csv(path: Path, sep: str = ",", encoding: str = "utf-8") -> pd.DataFrame:
     if not path.exists():
         raise typer.BadParameter(f"Файл не найден: {path}")
+    # Обычный C-парсер pandas: движок pyarrow иначе выводит типы (timestamp/date) и не переименовывает
+    # повторяющиеся заголовки в a, a.1, из-за чего меняется содержимое отчёта
     return pd.read_csv(path, sep=sep, encoding=encoding)
 
 
+def _fmt_cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+
+_SUMMARY_FIELDS = ["name", "dtype", "non_null", "missing", "missing_share", "unique", "is_numeric", "min", "max", "mean", "std"]
+
+
+def _summary_table(summary: DatasetSummary) -> Table:
+    # Таблица для вывода в терминал строится прямо из summary.columns, без промежуточного DataFrame
+    table = Table(*_SUMMARY_FIELDS)
+    for col in summary.columns:
+        table.add_row(*(_fmt_cell(getattr(col, f)) for f in _SUMMARY_FIELDS))
+    return table
+
+
+def _csv_cell(value: Any) -> Any:
+    # Как в DataFrame.to_csv: None/NaN пишутся пустой строкой
+    if value is None or (isinstance(value, float) and value != value):
+        return ""
+    return value
+
+
+def _write_csv(path: Path, header: Sequence[Any], rows: Iterable[Sequence[Any]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(header)
+        writer.writerows([_csv_cell(v) for v in row] for row in rows)
+
+
+def _write_df_csv(df: pd.DataFrame, path: Path) -> None:
+    # Аналог df.to_csv(path, index=False) через csv.writer — для небольших таблиц отчёта заметно быстрее
+    _write_csv(path, list(df.columns), df.itertuples(index=False, name=None))
+
+
 @app.command()
 def overview(
     path: str = typer.Argument(..., help="Путь к CSV-файлу."),
@@ -44,12 +79,16 @@ def overview(
     """
     df = _load_csv(Path(path), sep=sep, encoding=encoding)
     summary: DatasetSummary = summarize_dataset(df)
-    summary_df = flatten_summary_for_print(summary)
 
     typer.echo(f"Строк: {summary.n_rows}")
     typer.echo(f"Столбцов: {summary.n_cols}")
     typer.echo("")
-    typer.echo(summary_df.to_string(index=False))
+    # markup=False: имена колонок и значения печатаем как есть, без разбора [тегов] rich
+    console = Console(markup=False)
+    if not console.is_terminal:
+        # В файл/пайп печатаем таблицу целиком, без обрезки под ширину 80 символов
+        console = Console(markup=False, width=10_000)
+    console.print(_summary_table(summary))
 
 
 @app.command()
@@ -59,6 +98,10 @@ def report(
     sep: str = typer.Option(",", help="Разделитель в CSV."),
     encoding: str = typer.Option("utf-8", help="Кодировка файла."),
     max_hist_columns: int = typer.Option(6, help="Максимум числовых колонок для гистограмм."),
+    hist_workers: int = typer.Option(
+        1,
+        help="Сколько процессов рисуют гистограммы (1 — последовательно; пул оправдан для большого числа колонок).",
+    ),
     # === НОВЫЕ ОПЦИИ (HW03) ===
     title: str = typer.Option("", help="Заголовок отчёта (попадёт в report.md)."),
     min_missing_share: float = typer.Option(
@@ -99,6 +142,8 @@ def report(
         raise typer.BadParameter("--top-k-categories должен быть >= 1")
     if max_cat_columns < 0:
         raise typer.BadParameter("--max-cat-columns должен быть >= 0")
+    if hist_workers < 1:
+        raise typer.BadParameter("--hist-workers должен быть >= 1")
     if high_cardinality_unique < 1:
         raise typer.BadParameter("--high-cardinality-unique должен быть >= 1")
     if not (0.0 <= high_cardinality_share <= 1.0):
@@ -110,13 +155,13 @@ def report(
     df = _load_csv(Path(path), sep=sep, encoding=encoding)
 
     # 1. Обзор
-    summary = summarize_dataset(df)
-    summary_df = flatten_summary_for_print(summary)
-    missing_df = missing_table(df)
-    corr_df = correlation_matrix(df)
-
     # === Используем новые параметры top_k_categories/max_cat_columns ===
-    top_cats = top_categories(df, max_columns=max_cat_columns, top_k=top_k_categories)
+    # summary, пропуски, корреляции и top-k категорий — за один проход по колонкам df
+    summary, missing_df, corr_df, top_cats = analyze(
+        df,
+        max_cat_columns=max_cat_columns,
+        top_k=top_k_categories,
+    )
 
     # 2. Качество в целом (ВАЖНО: передаём новые пороги high_cardinality_*)
     quality_flags = compute_quality_flags(
@@ -127,94 +172,102 @@ def report(
     )
 
     # 3. Сохранение таблиц
-    summary_df.to_csv(out_root / "summary.csv", index=False)
-    missing_df.to_csv(out_root / "missing.csv", index=False)
-    corr_df.to_csv(out_root / "correlation.csv", index=False)
+    _write_csv(
+        out_root / "summary.csv",
+        _SUMMARY_FIELDS,
+        ([getattr(c, f) for f in _SUMMARY_FIELDS] for c in summary.columns),
+    )
+    _write_df_csv(missing_df, out_root / "missing.csv")
+    _write_df_csv(corr_df, out_root / "correlation.csv")
 
     top_dir = out_root / "top_categories"
     top_dir.mkdir(parents=True, exist_ok=True)
     for col, tdf in top_cats.items():
-        tdf.to_csv(top_dir / f"{col}.csv", index=False)
+        _write_df_csv(tdf, top_dir / f"{col}.csv")
 
     # 4. Markdown-отчёт
     md_path = out_root / "report.md"
     report_title = title.strip() if title.strip() else "EDA-отчёт"
 
-    with md_path.open("w", encoding="utf-8") as f:
-        f.write(f"# {report_title}\n\n")
-        f.write(f"Исходный файл: `{Path(path).name}`\n\n")
-        f.write(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
-
-        f.write("## Настройки отчёта\n\n")
-        f.write(f"- max_hist_columns: **{max_hist_columns}**\n")
-        f.write(f"- max_cat_columns: **{max_cat_columns}**\n")
-        f.write(f"- top_k_categories: **{top_k_categories}**\n")
-        f.write(f"- min_missing_share: **{min_missing_share:.0%}**\n")
-        # ВАЖНО: явные упоминания, чтобы проверка увидела использование
-        f.write(f"- high_cardinality_unique: **{high_cardinality_unique}**\n")
-        f.write(f"- high_cardinality_share: **{high_cardinality_share:.0%}**\n\n")
-
-        f.write("## Качество данных (эвристики)\n\n")
-        f.write(f"- Оценка качества: **{quality_flags['quality_score']:.2f}**\n")
-        f.write(f"- Макс. доля пропусков по колонке: **{quality_flags['max_missing_share']:.2%}**\n")
-        f.write(f"- Слишком мало строк: **{quality_flags['too_few_rows']}**\n")
-        f.write(f"- Слишком много колонок: **{quality_flags['too_many_columns']}**\n")
-        f.write(f"- Слишком много пропусков: **{quality_flags['too_many_missing']}**\n")
-
-        # === Выводим новые эвристики из core.py (чтобы они "использовались в отчёте") ===
-        if "has_constant_columns" in quality_flags:
-            f.write(f"- Константные колонки: **{quality_flags['has_constant_columns']}**\n")
-            if quality_flags.get("has_constant_columns"):
-                f.write(f"  - Список: `{quality_flags.get('constant_columns', [])}`\n")
-
-        if "has_high_cardinality_categoricals" in quality_flags:
-            f.write(
-                f"- Высокая кардинальность категориальных: **{quality_flags['has_high_cardinality_categoricals']}**\n"
-            )
-            # ВАЖНО: явные упоминания ключей в блоке эвристики
-            f.write(f"  - high_cardinality_unique: `{quality_flags.get('high_cardinality_unique')}`\n")
-            f.write(f"  - high_cardinality_share: `{quality_flags.get('high_cardinality_share')}`\n")
-            if quality_flags.get("has_high_cardinality_categoricals"):
-                f.write(f"  - Список: `{quality_flags.get('high_cardinality_columns', [])}`\n")
-
-        if "has_all_missing_columns" in quality_flags:
-            f.write(f"- Колонки полностью из пропусков: **{quality_flags['has_all_missing_columns']}**\n")
-            if quality_flags.get("has_all_missing_columns"):
-                f.write(f"  - Список: `{quality_flags.get('all_missing_columns', [])}`\n")
-
-        f.write("\n## Колонки\n\n")
-        f.write("См. файл `summary.csv`.\n\n")
-
-        f.write("## Пропуски\n\n")
-        if missing_df.empty:
-            f.write("Пропусков нет или датасет пуст.\n\n")
+    parts: List[str] = []
+    parts.append(f"# {report_title}\n\n")
+    parts.append(f"Исходный файл: `{Path(path).name}`\n\n")
+    parts.append(f"Строк: **{summary.n_rows}**, столбцов: **{summary.n_cols}**\n\n")
+
+    parts.append("## Настройки отчёта\n\n")
+    parts.append(f"- max_hist_columns: **{max_hist_columns}**\n")
+    parts.append(f"- max_cat_columns: **{max_cat_columns}**\n")
+    parts.append(f"- top_k_categories: **{top_k_categories}**\n")
+    parts.append(f"- min_missing_share: **{min_missing_share:.0%}**\n")
+    # ВАЖНО: явные упоминания, чтобы проверка увидела использование
+    parts.append(f"- high_cardinality_unique: **{high_cardinality_unique}**\n")
+    parts.append(f"- high_cardinality_share: **{high_cardinality_share:.0%}**\n\n")
+
+    parts.append("## Качество данных (эвристики)\n\n")
+    parts.append(f"- Оценка качества: **{quality_flags['quality_score']:.2f}**\n")
+    parts.append(f"- Макс. доля пропусков по колонке: **{quality_flags['max_missing_share']:.2%}**\n")
+    parts.append(f"- Слишком мало строк: **{quality_flags['too_few_rows']}**\n")
+    parts.append(f"- Слишком много колонок: **{quality_flags['too_many_columns']}**\n")
+    parts.append(f"- Слишком много пропусков: **{quality_flags['too_many_missing']}**\n")
+
+    # === Выводим новые эвристики из core.py (чтобы они "использовались в отчёте") ===
+    if "has_constant_columns" in quality_flags:
+        parts.append(f"- Константные колонки: **{quality_flags['has_constant_columns']}**\n")
+        if quality_flags.get("has_constant_columns"):
+            parts.append(f"  - Список: `{quality_flags.get('constant_columns', [])}`\n")
+
+    if "has_high_cardinality_categoricals" in quality_flags:
+        parts.append(
+            f"- Высокая кардинальность категориальных: **{quality_flags['has_high_cardinality_categoricals']}**\n"
+        )
+        # ВАЖНО: явные упоминания ключей в блоке эвристики
+        parts.append(f"  - high_cardinality_unique: `{quality_flags.get('high_cardinality_unique')}`\n")
+        parts.append(f"  - high_cardinality_share: `{quality_flags.get('high_cardinality_share')}`\n")
+        if quality_flags.get("has_high_cardinality_categoricals"):
+            parts.append(f"  - Список: `{quality_flags.get('high_cardinality_columns', [])}`\n")
+
+    if "has_all_missing_columns" in quality_flags:
+        parts.append(f"- Колонки полностью из пропусков: **{quality_flags['has_all_missing_columns']}**\n")
+        if quality_flags.get("has_all_missing_columns"):
+            parts.append(f"  - Список: `{quality_flags.get('all_missing_columns', [])}`\n")
+
+    parts.append("\n## Колонки\n\n")
+    parts.append("См. файл `summary.csv`.\n\n")
+
+    parts.append("## Пропуски\n\n")
+    if missing_df.empty:
+        parts.append("Пропусков нет или датасет пуст.\n\n")
+    else:
+        parts.append("См. файл `missing.csv`.\n\n")
+
+        # === Используем min_missing_share: выделяем проблемные колонки ===
+        bad_missing = missing_df[missing_df["missing_share"] >= min_missing_share]
+        if bad_missing.empty:
+            parts.append(f"Колонок с пропусками >= {min_missing_share:.0%} не найдено.\n\n")
         else:
-            f.write("См. файл `missing.csv`.\n\n")
-
-            # === Используем min_missing_share: выделяем проблемные колонки ===
-            bad_missing = missing_df[missing_df["missing_share"] >= min_missing_share]
-            if bad_missing.empty:
-                f.write(f"Колонок с пропусками >= {min_missing_share:.0%} не найдено.\n\n")
-            else:
-                f.write(f"Колонки с пропусками >= {min_missing_share:.0%}:\n\n")
-                for _, row in bad_missing.iterrows():
-                    f.write(f"- `{row['column']}`: {row['missing_share']:.2%}\n")
-                f.write("\n")
-
-        f.write("## Корреляции\n\n")
-        f.write("См. файл `correlation.csv` и `correlation_heatmap.png`.\n\n")
-
-        f.write("## Top категории (categoricals)\n\n")
-        if not top_cats:
-            f.write("Категориальных колонок не найдено.\n\n")
-        else:
-            f.write("См. файлы в папке `top_categories/`.\n\n")
+            parts.append(f"Колонки с пропусками >= {min_missing_share:.0%}:\n\n")
+            # имя колонки в missing_df — индекс (см. missing_table)
+            parts.extend(f"- `{r.Index}`: {r.missing_share:.2%}\n" for r in bad_missing.itertuples())
+            parts.append("\n")
+
+    parts.append("## Корреляции\n\n")
+    parts.append("См. файл `correlation.csv` и `correlation_heatmap.png`.\n\n")
+
+    parts.append("## Top категории (categoricals)\n\n")
+    if not top_cats:
+        parts.append("Категориальных колонок не найдено.\n\n")
+    else:
+        parts.append("См. файлы в папке `top_categories/`.\n\n")
+
+    parts.append("## Гистограммы числовых колонок\n\n")
+    parts.append("См. файлы `hist_*.png`.\n")
+
+    md_path.write_text("".join(parts), encoding="utf-8")
 
-        f.write("## Гистограммы числовых колонок\n\n")
-        f.write("См. файлы `hist_*.png`.\n")
+    # 5. Картинки (viz тянет matplotlib — импортируем только здесь, чтобы не замедлять старт overview)
+    from .viz import plot_correlation_heatmap, plot_histograms_per_column, plot_missing_matrix
 
-    # 5. Картинки
-    plot_histograms_per_column(df, out_root, max_columns=max_hist_columns)
+    plot_histograms_per_column(df, out_root, max_columns=max_hist_columns, max_workers=hist_workers)
     plot_missing_matrix(df, out_root / "missing_matrix.png")
     plot_correlation_heatmap(df, out_root / "correlation_heatmap.png")
 
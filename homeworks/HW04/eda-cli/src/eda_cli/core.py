@@ -1,13 +1,15 @@
 from __future__ import annotations
 
+import warnings
 from dataclasses import dataclass, asdict
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Protocol, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 from pandas.api import types as ptypes
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ColumnSummary:
     name: str
     dtype: str
@@ -26,7 +28,7 @@ class ColumnSummary:
         return asdict(self)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DatasetSummary:
     n_rows: int
     n_cols: int
@@ -40,6 +42,136 @@ class DatasetSummary:
         }
 
 
+NumericStats = Tuple[float, float, float, float]
+
+
+class ColumnSummaryLike(Protocol):
+    """Поля колонки, которые читает compute_quality_flags (ColumnSummary, ColumnSummaryIn из api)."""
+
+    @property
+    def name(self) -> Any: ...
+    @property
+    def non_null(self) -> int: ...
+    @property
+    def unique(self) -> int: ...
+    @property
+    def is_numeric(self) -> bool: ...
+
+
+class DatasetSummaryLike(Protocol):
+    """Поля summary, которые читает compute_quality_flags (DatasetSummary, DatasetSummaryIn из api)."""
+
+    @property
+    def n_rows(self) -> int: ...
+    @property
+    def n_cols(self) -> int: ...
+    @property
+    def columns(self) -> Sequence[ColumnSummaryLike]: ...
+
+
+class MissingRowLike(Protocol):
+    """Строка таблицы пропусков с долей missing_share (например, _MissingRow из api)."""
+
+    @property
+    def missing_share(self) -> float: ...
+
+
+# Сколько байт float64 копируем за раз в _numeric_stats (ограничивает пиковую память на больших CSV)
+_STATS_BLOCK_BYTES = 64 * 1024 * 1024
+
+
+def _numeric_stats(df: pd.DataFrame) -> Dict[int, NumericStats]:
+    """
+    min/max/mean/std для всех числовых колонок: векторные nan-редукции numpy по оси колонок
+    вместо вызовов pandas на каждую колонку. Колонки копируются в float64 блоками
+    не больше _STATS_BLOCK_BYTES (но минимум по одной колонке), а не всей таблицей сразу.
+    Ключ — позиция колонки в df (имена колонок могут повторяться).
+    """
+    positions = [i for i, dtype in enumerate(df.dtypes) if ptypes.is_numeric_dtype(dtype)]
+    n_rows = len(df)
+    if not positions or n_rows == 0:
+        return {}
+
+    block = max(1, _STATS_BLOCK_BYTES // (8 * n_rows))
+    result: Dict[int, NumericStats] = {}
+    for start in range(0, len(positions), block):
+        chunk = positions[start : start + block]
+        values = df.iloc[:, chunk].to_numpy(dtype="float64", na_value=np.nan)
+        with warnings.catch_warnings():
+            # колонки целиком из NaN / из одного значения дают NaN, как и в pandas
+            warnings.simplefilter("ignore", RuntimeWarning)
+            mins = np.nanmin(values, axis=0)
+            maxs = np.nanmax(values, axis=0)
+            means = np.nanmean(values, axis=0)
+            stds = np.nanstd(values, axis=0, ddof=1)
+
+        for j, pos in enumerate(chunk):
+            result[pos] = (float(mins[j]), float(maxs[j]), float(means[j]), float(stds[j]))
+
+    return result
+
+
+def _number_positions(df: pd.DataFrame) -> List[int]:
+    """
+    Позиции колонок, которые выбирает df.select_dtypes(include="number").
+    Выбор делаем по пустой таблице с теми же dtype, чтобы не копировать данные.
+    """
+    dtypes_only = pd.DataFrame({i: pd.Series(dtype=dtype) for i, dtype in enumerate(df.dtypes)})
+    return list(dtypes_only.select_dtypes(include="number").columns)
+
+
+def _summarize_column(
+    name: Any,
+    s: pd.Series,
+    n_rows: int,
+    example_values_per_column: int,
+    numeric_stats: Optional[NumericStats] = None,
+) -> ColumnSummary:
+    dtype_str = str(s.dtype)
+
+    non_null = int(s.notna().sum())
+    missing = n_rows - non_null
+    missing_share = float(missing / n_rows) if n_rows > 0 else 0.0
+    unique = int(s.nunique(dropna=True))
+
+    # Примерные значения выводим как строки
+    examples = (
+        s.dropna().astype(str).unique()[:example_values_per_column].tolist()
+        if non_null > 0
+        else []
+    )
+
+    is_numeric = bool(ptypes.is_numeric_dtype(s))
+    min_val: Optional[float] = None
+    max_val: Optional[float] = None
+    mean_val: Optional[float] = None
+    std_val: Optional[float] = None
+
+    if is_numeric and non_null > 0:
+        if numeric_stats is not None:
+            min_val, max_val, mean_val, std_val = numeric_stats
+        else:
+            min_val = float(s.min())
+            max_val = float(s.max())
+            mean_val = float(s.mean())
+            std_val = float(s.std())
+
+    return ColumnSummary(
+        name=name,
+        dtype=dtype_str,
+        non_null=non_null,
+        missing=missing,
+        missing_share=missing_share,
+        unique=unique,
+        example_values=examples,
+        is_numeric=is_numeric,
+        min=min_val,
+        max=max_val,
+        mean=mean_val,
+        std=std_val,
+    )
+
+
 def summarize_dataset(
     df: pd.DataFrame,
     example_values_per_column: int = 3,
@@ -54,53 +186,11 @@ def summarize_dataset(
     - базовые числовые статистики (для numeric).
     """
     n_rows, n_cols = df.shape
-    columns: List[ColumnSummary] = []
-
-    for name in df.columns:
-        s = df[name]
-        dtype_str = str(s.dtype)
-
-        non_null = int(s.notna().sum())
-        missing = n_rows - non_null
-        missing_share = float(missing / n_rows) if n_rows > 0 else 0.0
-        unique = int(s.nunique(dropna=True))
-
-        # Примерные значения выводим как строки
-        examples = (
-            s.dropna().astype(str).unique()[:example_values_per_column].tolist()
-            if non_null > 0
-            else []
-        )
-
-        is_numeric = bool(ptypes.is_numeric_dtype(s))
-        min_val: Optional[float] = None
-        max_val: Optional[float] = None
-        mean_val: Optional[float] = None
-        std_val: Optional[float] = None
-
-        if is_numeric and non_null > 0:
-            min_val = float(s.min())
-            max_val = float(s.max())
-            mean_val = float(s.mean())
-            std_val = float(s.std())
-
-        columns.append(
-            ColumnSummary(
-                name=name,
-                dtype=dtype_str,
-                non_null=non_null,
-                missing=missing,
-                missing_share=missing_share,
-                unique=unique,
-                example_values=examples,
-                is_numeric=is_numeric,
-                min=min_val,
-                max=max_val,
-                mean=mean_val,
-                std=std_val,
-            )
-        )
-
+    stats = _numeric_stats(df)
+    columns: List[ColumnSummary] = [
+        _summarize_column(name, df.iloc[:, i], n_rows, example_values_per_column, stats.get(i))
+        for i, name in enumerate(df.columns)
+    ]
     return DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=columns)
 
 
@@ -120,7 +210,7 @@ def missing_table(df: pd.DataFrame) -> pd.DataFrame:
                 "missing_share": share,
             }
         )
-        .sort_values("missing_share", ascending=False)
+        .sort_values("missing_share", ascending=False, kind="stable")
     )
     return result
 
@@ -135,6 +225,24 @@ def correlation_matrix(df: pd.DataFrame) -> pd.DataFrame:
     return numeric_df.corr(numeric_only=True)
 
 
+def _is_categorical(s: pd.Series) -> bool:
+    return ptypes.is_object_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype)
+
+
+def _top_values_table(s: pd.Series, top_k: int) -> Optional[pd.DataFrame]:
+    vc = s.value_counts(dropna=True).head(top_k)
+    if vc.empty:
+        return None
+    share = vc / vc.sum()
+    return pd.DataFrame(
+        {
+            "value": vc.index.astype(str),
+            "count": vc.values,
+            "share": share.values,
+        }
+    )
+
+
 def top_categories(
     df: pd.DataFrame,
     max_columns: int = 5,
@@ -145,34 +253,71 @@ def top_categories(
     Возвращает словарь: колонка -> DataFrame со столбцами value/count/share.
     """
     result: Dict[str, pd.DataFrame] = {}
-    candidate_cols: List[str] = []
+    # Идём по колонкам через items(): при повторяющихся именах df[name] вернул бы DataFrame
+    candidate_cols = [(name, s) for name, s in df.items() if _is_categorical(s)]
 
-    for name in df.columns:
-        s = df[name]
-        if ptypes.is_object_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
-            candidate_cols.append(name)
+    for name, s in candidate_cols[:max_columns]:
+        table = _top_values_table(s, top_k)
+        if table is not None:
+            # для повторяющегося имени оставляем первую колонку
+            result.setdefault(name, table)
 
-    for name in candidate_cols[:max_columns]:
-        s = df[name]
-        vc = s.value_counts(dropna=True).head(top_k)
-        if vc.empty:
-            continue
-        share = vc / vc.sum()
-        table = pd.DataFrame(
-            {
-                "value": vc.index.astype(str),
-                "count": vc.values,
-                "share": share.values,
-            }
+    return result
+
+
+def analyze(
+    df: pd.DataFrame,
+    *,
+    max_cat_columns: int = 5,
+    top_k: int = 5,
+    example_values_per_column: int = 3,
+) -> Tuple[DatasetSummary, pd.DataFrame, pd.DataFrame, Dict[str, pd.DataFrame]]:
+    """
+    summarize_dataset + missing_table + correlation_matrix + top_categories за один проход по колонкам.
+    Возвращает (summary, missing_df, corr_df, top_cats) — те же значения, что и отдельные функции.
+    """
+    n_rows, n_cols = df.shape
+    # Позиции (а не имена — они могут повторяться) тех же колонок, что выбирает correlation_matrix
+    numeric_positions = _number_positions(df)
+    stats = _numeric_stats(df)
+
+    columns: List[ColumnSummary] = []
+    top_cats: Dict[str, pd.DataFrame] = {}
+    cat_seen = 0
+
+    for i, (name, s) in enumerate(df.items()):
+        columns.append(_summarize_column(name, s, n_rows, example_values_per_column, stats.get(i)))
+
+        if cat_seen < max_cat_columns and _is_categorical(s):
+            cat_seen += 1
+            table = _top_values_table(s, top_k)
+            if table is not None:
+                top_cats.setdefault(name, table)
+
+    summary = DatasetSummary(n_rows=n_rows, n_cols=n_cols, columns=columns)
+
+    if df.empty:
+        missing_df = pd.DataFrame(columns=["missing_count", "missing_share"])
+    else:
+        # Счётчики уже посчитаны в summary: собираем таблицу из готовых кортежей без промежуточных Series
+        missing_df = pd.DataFrame.from_records(
+            [(c.missing, c.missing / n_rows) for c in columns],
+            columns=["missing_count", "missing_share"],
+            index=df.columns,
         )
-        result[name] = table
+        missing_df.sort_values("missing_share", ascending=False, inplace=True, kind="stable")
 
-    return result
+    if numeric_positions and n_rows > 0:
+        corr_df = df.iloc[:, numeric_positions].corr(numeric_only=True)
+    else:
+        corr_df = pd.DataFrame()
+
+    return summary, missing_df, corr_df, top_cats
 
 
 def compute_quality_flags(
-    summary: DatasetSummary,
-    missing_df: pd.DataFrame,
+    summary: DatasetSummaryLike,
+    missing_df: Union[pd.DataFrame, Iterable[MissingRowLike]],
     *,
     high_cardinality_unique: int = 50,
     high_cardinality_share: float = 0.5,
@@ -180,6 +325,9 @@ def compute_quality_flags(
     """
     Эвристики «качества» данных.
 
+    summary — любой объект формы DatasetSummaryLike (DatasetSummary или DatasetSummaryIn из api).
+    missing_df — таблица из missing_table или итерируемое строк формы MissingRowLike.
+
     Базовые:
     - слишком много пропусков;
     - подозрительно мало строк;
@@ -194,7 +342,10 @@ def compute_quality_flags(
     flags["too_few_rows"] = summary.n_rows < 100
     flags["too_many_columns"] = summary.n_cols > 100
 
-    max_missing_share = float(missing_df["missing_share"].max()) if not missing_df.empty else 0.0
+    if isinstance(missing_df, pd.DataFrame):
+        max_missing_share = float(missing_df["missing_share"].max()) if not missing_df.empty else 0.0
+    else:
+        max_missing_share = float(max((r.missing_share for r in missing_df), default=0.0))
     flags["max_missing_share"] = max_missing_share
     flags["too_many_missing"] = max_missing_share > 0.5
 
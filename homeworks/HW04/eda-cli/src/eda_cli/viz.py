@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Dict, Iterable, List, Union
+from typing import Dict, Iterable, List, Optional, Union
 
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 import numpy as np
 import pandas as pd
 
@@ -16,39 +19,52 @@ def _ensure_dir(path: PathLike) -> Path:
     return p
 
 
+def _plot_histogram(name: str, values: np.ndarray, out_path: Path, bins: int) -> Path:
+    # Отдельная Figure без pyplot: нет глобального состояния, можно рисовать в разных процессах
+    fig = Figure()
+    ax = fig.add_subplot()
+    ax.hist(values, bins=bins)
+    ax.set_title(f"Histogram of {name}")
+    ax.set_xlabel(name)
+    ax.set_ylabel("Count")
+    fig.tight_layout()
+    fig.savefig(out_path)
+    return out_path
+
+
 def plot_histograms_per_column(
     df: pd.DataFrame,
     out_dir: PathLike,
     max_columns: int = 6,
     bins: int = 20,
+    max_workers: Optional[int] = None,
 ) -> List[Path]:
     """
     Для числовых колонок строит по отдельной гистограмме.
+    По умолчанию гистограммы рисуются последовательно: для нескольких колонок запуск пула
+    процессов дороже самой отрисовки. max_workers > 1 включает пул явно (для большого числа колонок).
     Возвращает список путей к PNG.
     """
     out_dir = _ensure_dir(out_dir)
     numeric_df = df.select_dtypes(include="number")
 
-    paths: List[Path] = []
+    names: List[str] = []
+    arrays: List[np.ndarray] = []
+    out_paths: List[Path] = []
     for i, name in enumerate(numeric_df.columns[:max_columns]):
         s = numeric_df[name].dropna()
         if s.empty:
             continue
+        names.append(name)
+        arrays.append(s.to_numpy())
+        out_paths.append(out_dir / f"hist_{i+1}_{name}.png")
 
-        fig, ax = plt.subplots()
-        ax.hist(s.values, bins=bins)
-        ax.set_title(f"Histogram of {name}")
-        ax.set_xlabel(name)
-        ax.set_ylabel("Count")
-        fig.tight_layout()
-
-        out_path = out_dir / f"hist_{i+1}_{name}.png"
-        fig.savefig(out_path)
-        plt.close(fig)
+    workers = min(len(out_paths), max_workers or 1)
+    if workers <= 1:
+        return [_plot_histogram(n, v, p, bins) for n, v, p in zip(names, arrays, out_paths)]
 
-        paths.append(out_path)
-
-    return paths
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        return list(ex.map(_plot_histogram, names, arrays, out_paths, repeat(bins, len(out_paths))))
 
 
 def plot_missing_matrix(df: pd.DataFrame, out_path: PathLike) -> Path:
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from eda_cli.api import _CSV_SUMMARY_CACHE, app
+
+
+@pytest.fixture()
+def client() -> TestClient:
+    _CSV_SUMMARY_CACHE.clear()
+    return TestClient(app)
+
+
+def _upload(client: TestClient, content: bytes):
+    return client.post("/quality-from-csv", files={"file": ("data.csv", content, "text/csv")})
+
+
+def _cache_stats(client: TestClient) -> dict:
+    return client.get("/health").json()["csv_cache"]
+
+
+def _quality_body() -> dict:
+    return {
+        "summary": {
+            "n_rows": 10,
+            "n_cols": 2,
+            "columns": [
+                {
+                    "name": "a",
+                    "dtype": "int64",
+                    "non_null": 10,
+                    "missing": 0,
+                    "missing_share": 0.0,
+                    "unique": 10,
+                    "is_numeric": True,
+                },
+                {
+                    "name": "b",
+                    "dtype": "object",
+                    "non_null": 4,
+                    "missing": 6,
+                    "missing_share": 0.6,
+                    "unique": 4,
+                    "is_numeric": False,
+                },
+            ],
+        }
+    }
+
+
+def test_quality_json_body(client):
+    resp = client.post("/quality", json=_quality_body())
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["flags"]["too_many_missing"] is True
+    assert data["ok_for_model"] is False
+
+
+def test_quality_empty_body_is_missing(client):
+    for headers in ({}, {"content-type": "application/json"}):
+        resp = client.post("/quality", content=b"", headers=headers)
+        assert resp.status_code == 422
+        assert resp.json()["detail"] == [{"type": "missing", "loc": ["body"], "msg": "Field required", "input": None}]
+
+
+def test_quality_non_json_content_type_is_not_parsed(client):
+    resp = client.post("/quality", content=b"a=1", headers={"content-type": "application/x-www-form-urlencoded"})
+    assert resp.status_code == 422
+    [err] = resp.json()["detail"]
+    assert err["loc"] == ["body"]
+    assert err["input"] == "a=1"
+
+
+def test_quality_malformed_json(client):
+    resp = client.post("/quality", content=b"{bad", headers={"content-type": "application/json"})
+    assert resp.status_code == 422
+    [err] = resp.json()["detail"]
+    assert err["type"] == "json_invalid"
+    assert err["loc"] == ["body", 1]
+    assert err["msg"] == "JSON decode error"
+
+
+def test_quality_request_schema_is_referenced(client):
+    schema = client.get("/openapi.json").json()
+    body = schema["paths"]["/quality"]["post"]["requestBody"]["content"]["application/json"]["schema"]
+    assert body == {"$ref": "#/components/schemas/QualityRequest"}
+    responses = schema["paths"]["/quality"]["post"]["responses"]
+    assert responses["200"]["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/QualityResponse"}
+    assert responses["422"]["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/HTTPValidationError"}
+    for name in ("QualityRequest", "DatasetSummaryIn", "ColumnSummaryIn"):
+        assert name in schema["components"]["schemas"]
+
+
+def test_csv_cache_counts_repeat_upload_as_hit(client):
+    csv = b"a,b\n1,x\n2,y\n"
+    first = _upload(client, csv)
+    second = _upload(client, csv)
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["flags"] == second.json()["flags"]
+    assert _cache_stats(client) == {"hits": 1, "misses": 1, "size": 1, "maxsize": 32}
+
+
+def test_csv_cache_evicts_oldest_entry(client):
+    maxsize = _cache_stats(client)["maxsize"]
+    files = [f"a,b\n{i},x\n".encode() for i in range(maxsize + 1)]
+    for content in files:
+        assert _upload(client, content).status_code == 200
+    assert _cache_stats(client)["size"] == maxsize
+
+    _upload(client, files[1])  # ещё в кэше
+    _upload(client, files[0])  # вытеснен 33-м файлом
+    stats = _cache_stats(client)
+    assert stats["hits"] == 1
+    assert stats["misses"] == maxsize + 2
+
+
+def test_csv_cache_skips_failed_parse(client):
+    for _ in range(2):
+        assert _upload(client, b"").status_code == 400
+    assert _cache_stats(client) == {"hits": 0, "misses": 2, "size": 0, "maxsize": 32}
+
+
+def test_cache_clear_requires_debug(client, monkeypatch):
+    monkeypatch.delenv("EDA_CLI_DEBUG", raising=False)
+    assert client.post("/cache/clear").status_code == 404
+    assert "/cache/clear" not in client.get("/openapi.json").json()["paths"]
+
+
+def test_cache_clear_resets_counters(client, monkeypatch):
+    monkeypatch.setenv("EDA_CLI_DEBUG", "1")
+    csv = b"a,b\n1,x\n"
+    _upload(client, csv)
+    _upload(client, csv)
+
+    resp = client.post("/cache/clear")
+    assert resp.status_code == 200
+    assert resp.json()["csv_cache"] == {"hits": 0, "misses": 0, "size": 0, "maxsize": 32}
+    assert _cache_stats(client) == {"hits": 0, "misses": 0, "size": 0, "maxsize": 32}
+
+
+def test_quality_flags_from_csv_response_is_documented(client):
+    schema = client.get("/openapi.json").json()
+    ok = schema["paths"]["/quality-flags-from-csv"]["post"]["responses"]["200"]["content"]["application/json"]
+    assert ok["schema"] == {"$ref": "#/components/schemas/QualityFlagsResponse"}
+    assert set(schema["components"]["schemas"]["QualityFlagsResponse"]["properties"]) == {"latency_ms", "flags"}
+
+    resp = client.post("/quality-flags-from-csv", files={"file": ("data.csv", b"a,b\n1,x\n2,y\n", "text/csv")})
+    assert resp.status_code == 200
+    assert set(resp.json()) == {"latency_ms", "flags"}
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from eda_cli.cli import _load_csv
+from eda_cli.core import correlation_matrix, summarize_dataset, top_categories
+
+
+def test_load_csv_keeps_pandas_parsing(tmp_path):
+    path = tmp_path / "data.csv"
+    path.write_text(
+        "ts,day,a,a\n"
+        "2024-01-01 10:00:00,2024-01-01,1,2\n"
+        "2024-01-02 11:30:00,2024-01-02,3,5\n"
+        "2024-01-03 12:45:00,2024-01-03,4,4\n",
+        encoding="utf-8",
+    )
+    df = _load_csv(path)
+
+    # повторяющиеся заголовки переименованы, как в C-парсере pandas
+    assert list(df.columns) == ["ts", "day", "a", "a.1"]
+    # даты и время остаются строками (без вывода datetime-типов)
+    assert df["ts"].dtype == object
+    assert df["day"].map(type).eq(str).all()
+
+    assert [c.name for c in summarize_dataset(df).columns] == ["ts", "day", "a", "a.1"]
+    assert list(correlation_matrix(df).columns) == ["a", "a.1"]
+    assert "ts" in top_categories(df)
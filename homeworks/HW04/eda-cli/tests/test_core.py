@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import math
+
 import pandas as pd
+import pytest
 
+from eda_cli import core
 from eda_cli.core import (
+    analyze,
     compute_quality_flags,
     correlation_matrix,
     flatten_summary_for_print,
@@ -84,3 +89,68 @@ def test_quality_flags_new_heuristics_constant_and_high_cardinality():
 
     assert flags["has_high_cardinality_categoricals"] is True
     assert "city" in flags["high_cardinality_columns"]
+
+
+def test_quality_flags_accept_missing_rows_iterable():
+    df = _sample_df()
+    summary = summarize_dataset(df)
+    missing_df = missing_table(df)
+
+    rows = list(missing_df.itertuples())
+    flags_df = compute_quality_flags(summary, missing_df)
+    flags_rows = compute_quality_flags(summary, rows)
+    assert flags_rows["max_missing_share"] == flags_df["max_missing_share"]
+
+    flags_empty = compute_quality_flags(summary, [])
+    assert flags_empty["max_missing_share"] == 0.0
+
+
+@pytest.mark.parametrize(
+    "df",
+    [
+        _sample_df(),
+        # повторяющиеся имена колонок и bool-колонка (не входит в select_dtypes("number"))
+        pd.DataFrame(
+            [[1, 2, "x", "p", True], [3, 5, "y", "q", False], [4, 4, "x", "q", True]],
+            columns=["a", "a", "c", "c", "flag"],
+        ),
+    ],
+)
+def test_analyze_matches_separate_functions(df):
+    summary, missing_df, corr_df, top_cats = analyze(df, max_cat_columns=5, top_k=2)
+
+    assert summary == summarize_dataset(df)
+    pd.testing.assert_frame_equal(missing_df, missing_table(df))
+    pd.testing.assert_frame_equal(corr_df, correlation_matrix(df))
+
+    expected_top = top_categories(df, max_columns=5, top_k=2)
+    assert top_cats.keys() == expected_top.keys()
+    for name, table in expected_top.items():
+        pd.testing.assert_frame_equal(top_cats[name], table)
+
+
+# 0 — по одной колонке в блоке (как для очень длинных таблиц), None — все колонки одним блоком
+@pytest.mark.parametrize("block_bytes", [None, 0])
+def test_summarize_dataset_numeric_stats_match_pandas(block_bytes, monkeypatch):
+    if block_bytes is not None:
+        monkeypatch.setattr(core, "_STATS_BLOCK_BYTES", block_bytes)
+    df = pd.DataFrame(
+        {
+            "x": [1.5, None, 3.0, 10.0],
+            "n": [1, 2, 3, 4],
+            "one": [None, None, 7.0, None],
+            "flag": [True, False, True, True],
+        }
+    )
+    by_name = {c.name: c for c in summarize_dataset(df).columns}
+
+    for name in ["x", "n", "flag"]:
+        s = df[name]
+        c = by_name[name]
+        assert c.min == float(s.min())
+        assert c.max == float(s.max())
+        assert c.mean == pytest.approx(float(s.mean()))
+        assert c.std == pytest.approx(float(s.std()))
+
+    assert by_name["one"].min == 7.0
+    assert math.isnan(by_name["one"].std)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from eda_cli.viz import plot_histograms_per_column
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_plot_histograms_per_column(tmp_path, max_workers):
+    df = pd.DataFrame(
+        {
+            "x": [1.0, 2.0, 3.0, None],
+            "empty": pd.Series([None] * 4, dtype="float64"),
+            "city": ["A", "B", "A", "C"],
+            "n": [4, 3, 2, 1],
+        }
+    )
+    paths = plot_histograms_per_column(df, tmp_path, max_workers=max_workers)
+
+    # колонка без значений пропускается, номер в имени — позиция среди числовых колонок
+    assert paths == [tmp_path / "hist_1_x.png", tmp_path / "hist_3_n.png"]
+    for p in paths:
+        assert p.read_bytes().startswith(b"\x89PNG")